@@ -1,101 +1,683 @@
+import datetime
+import email.utils
+import functools
+import gzip
+import html
 import http.server
-import socketserver
+import io
+import shutil
+import socket
+import stat
 import sys
 import argparse
 import logging
+import logging.handlers
+import os
+import queue
+import selectors
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
 from pathlib import Path
-from urllib.parse import urlparse, unquote
-import mimetypes
+from urllib.parse import unquote, quote
 import signal
 
+# Request threads build the message and put the record on a queue; a listener
+# thread adds the timestamp/level prefix and does the console/file writes
+_log_queue = queue.SimpleQueue()
+_log_handlers = [logging.StreamHandler(), logging.FileHandler("server.log")]
+for _handler in _log_handlers:
+    _handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    )
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(), logging.FileHandler("server.log")],
+    format="%(message)s",
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
 )
 logger = logging.getLogger(__name__)
 
+# Per served directory: (mtime_ns, index body, routes), where routes maps the
+# URL of each listed page to (file path, content type). A directory's mtime
+# changes whenever an entry is added, removed or renamed, so it is enough
+# to tell when the listing has to be rebuilt. Routes are only a shortcut
+# past path mapping; URLs missing from them take the regular path.
+_INDEX_CACHE = {}
+_INDEX_LOCK = threading.Lock()
+
+# Bodies of small files, least recently used first:
+# {path: ((mtime_ns, size), body, gzipped body or None)}. The gzip variant is
+# made on the first request that accepts it. Files above _BODY_CACHE_MAX_FILE
+# are not cached (nor compressed) and go out via sendfile(), which bounds
+# the cache at 16 MiB plus the compressed copies.
+_BODY_CACHE = OrderedDict()
+_BODY_CACHE_LOCK = threading.Lock()
+_BODY_CACHE_MAX_ENTRIES = 64
+_BODY_CACHE_MAX_FILE = 256 * 1024
+
+# Content types worth gzipping; anything else is sent as is
+_COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/wasm",
+    "image/svg+xml",
+)
+
+# Block size for copies that can't use sendfile() (in practice Windows and
+# in-memory sources): at least 128 KiB, and never below shutil's own
+# platform default (64 KiB, or 1 MiB on Windows).
+_COPY_BUFSIZE = max(128 * 1024, shutil.COPY_BUFSIZE)
+
+# Tells Linux more data follows (the sendfile() body), so the header block
+# shares a segment with it instead of going out on its own
+_MSG_MORE = getattr(socket, "MSG_MORE", 0)
+
+
+def _cached_body(path, st, gzipped=False):
+    key = (st.st_mtime_ns, st.st_size)
+    with _BODY_CACHE_LOCK:
+        entry = _BODY_CACHE.get(path)
+        if entry is not None and entry[0] == key:
+            _BODY_CACHE.move_to_end(path)
+            if not gzipped:
+                return entry[1]
+            if entry[2] is not None:
+                return entry[2]
+        else:
+            entry = None
+    if entry is None:
+        with open(path, "rb") as f:
+            entry = (key, f.read(), None)
+    if gzipped:
+        entry = (key, entry[1], gzip.compress(entry[1], compresslevel=6, mtime=0))
+    with _BODY_CACHE_LOCK:
+        _BODY_CACHE[path] = entry
+        _BODY_CACHE.move_to_end(path)
+        while len(_BODY_CACHE) > _BODY_CACHE_MAX_ENTRIES:
+            _BODY_CACHE.popitem(last=False)
+    return entry[2] if gzipped else entry[1]
+
+
+def _accepts_gzip(accept_encoding):
+    for coding in accept_encoding.split(","):
+        name, _, q = coding.partition(";")
+        if name.strip().lower() == "gzip":
+            q = q.strip().removeprefix("q=")
+            try:
+                return not q or float(q) > 0
+            except ValueError:
+                return False
+    return False
+
+
+# Headers added to every response: COOP/COEP (SharedArrayBuffer) and dev
+# caching. Cache-Control is "no-cache" rather than "no-store" so the browser
+# keeps a copy but revalidates it (ETag/Last-Modified) on each load.
+_COI_HEADERS = (
+    b"Cross-Origin-Opener-Policy: same-origin\r\n"
+    b"Cross-Origin-Embedder-Policy: require-corp\r\n"
+    b"Cross-Origin-Resource-Policy: same-origin\r\n"
+    b"X-Content-Type-Options: nosniff\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Pragma: no-cache\r\n"
+    b"Expires: 0\r\n"
+)
+
+# Status line and per-file headers of a 200 file response, with slots for
+# the protocol version and optional extra header lines; end_headers()
+# appends _COI_HEADERS and the blank line
+_FILE_200_HEADERS = (
+    b"%s 200 OK\r\n"
+    b"Server: %s\r\n"
+    b"Date: %s\r\n"
+    b"Content-Type: %s\r\n"
+    b"Content-Length: %d\r\n"
+    b"Last-Modified: %s\r\n"
+    b"ETag: %s\r\n"
+    b"%s"
+)
+
+
+# Error pages only depend on their template and text, so each one is
+# formatted and encoded once. Bounded because some messages embed request
+# data (e.g. the method of an unsupported request).
+@functools.lru_cache(maxsize=64)
+def _error_body(template, code, message, explain):
+    content = template % {
+        "code": code,
+        "message": html.escape(message, quote=False),
+        "explain": html.escape(explain, quote=False),
+    }
+    return content.encode("utf-8", "replace")
+
 
 class COIRequestHandler(http.server.SimpleHTTPRequestHandler):
-    # Serve from a specific directory (set by the server)
+    # Serve from a specific directory, resolved once in main()
+    _resolved_root = None
+
+    # Buffer writes so the header block and a small generated body (index
+    # page, error page) leave in one send(). File responses hold their
+    # headers back instead and copyfile() sends them with the body, since
+    # a cached body can be larger than this buffer.
+    wbufsize = 64 * 1024
+    _hold_headers = False
+    _held_headers = b""
+    # Responses are written in as few pieces as possible; don't let Nagle
+    # hold the last one back waiting for a delayed ACK
+    disable_nagle_algorithm = True
+
+    # Keep connections open between requests (every response carries a
+    # Content-Length). Between requests a connection is parked with the
+    # server rather than holding a pool worker (see handle()); the timeout
+    # only covers a client stalling in the middle of a request.
+    protocol_version = "HTTP/1.1"
+    timeout = 15
+    idle = False
+
+    # Content types for what this repo actually serves, so the common case
+    # is a dict hit and never reaches the mimetypes module
+    extensions_map = {
+        **http.server.SimpleHTTPRequestHandler.extensions_map,
+        ".html": "text/html; charset=utf-8",
+        ".htm": "text/html; charset=utf-8",
+        ".js": "text/javascript; charset=utf-8",
+        ".mjs": "text/javascript; charset=utf-8",
+        ".css": "text/css; charset=utf-8",
+        ".json": "application/json",
+        ".wasm": "application/wasm",
+    }
+
     def __init__(self, *args, directory=None, **kwargs):
+        if directory is None:
+            directory = self._resolved_root
         super().__init__(*args, directory=directory, **kwargs)
 
-    # Inject COOP/COEP (and a couple of helpful) headers on every response
+    # Inject COOP/COEP (and a couple of helpful) headers on every response.
+    # Appends raw bytes to _headers_buffer, the list of encoded lines that
+    # BaseHTTPRequestHandler's send_header() fills and flush_headers()
+    # joins; it is private to http.server, so recheck on Python upgrades.
     def end_headers(self):
-        self.send_header("Cross-Origin-Opener-Policy", "same-origin")
-        self.send_header("Cross-Origin-Embedder-Policy", "require-corp")
-        self.send_header("Cross-Origin-Resource-Policy", "same-origin")
-        self.send_header("X-Content-Type-Options", "nosniff")
-        # Dev caching—tweak as you like
-        self.send_header("Cache-Control", "no-cache, no-store, must-revalidate")
-        self.send_header("Pragma", "no-cache")
-        self.send_header("Expires", "0")
+        if self.request_version != "HTTP/0.9":
+            self._headers_buffer.append(_COI_HEADERS)
         super().end_headers()
 
+    def flush_headers(self):
+        if self._hold_headers:
+            self._hold_headers = False
+            self._held_headers = b"".join(self._headers_buffer)
+            self._headers_buffer = []
+            return
+        super().flush_headers()
+
+    # Serve requests while the client has one ready. Once it has nothing
+    # more to send, mark the connection idle and return without closing
+    # it, so the server can watch it and call resume() when the next
+    # request arrives.
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            if not self._request_buffered():
+                self.idle = True
+                return
+            self.handle_one_request()
+
+    def resume(self):
+        self.idle = False
+        try:
+            self.handle()
+        finally:
+            self.finish()
+
+    def finish(self):
+        if not self.idle:
+            super().finish()
+
+    # Whether the next request (or EOF) can be read without waiting
+    def _request_buffered(self):
+        self.connection.setblocking(False)
+        try:
+            return bool(self.rfile.peek(1))
+        finally:
+            self.connection.settimeout(self.timeout)
+
     # Optional: keep your index at "/"
     def do_GET(self):
-        parsed = urlparse(self.path)
-        path = unquote(parsed.path)
-        if path == "/":
+        if self._url_path() == "/":
             return self._serve_index()
         return super().do_GET()
 
-    def _serve_index(self):
+    def do_HEAD(self):
+        if self._url_path() == "/":
+            return self._serve_index()
+        return super().do_HEAD()
+
+    # Regular files are served here, small ones from _BODY_CACHE and the
+    # rest via sendfile(); directories (redirects, listings) take the stock
+    # path.
+    def send_head(self):
+        # Pages listed on the index are looked up by URL as-is
+        entry = _INDEX_CACHE.get(self.directory)
+        route = entry[2].get(self.path) if entry is not None else None
+        if route is not None:
+            path, ctype = route
+        else:
+            path, ctype = self._file_path(), None
+            if path is None:
+                self.send_error(HTTPStatus.FORBIDDEN, "Access denied")
+                return None
+        # One stat answers existence, type, size and mtime for the response
         try:
-            # list only .html by default; adjust if you want to list others
-            html_files = sorted(
-                [p.name for p in Path(self.directory).glob("*.html") if p.is_file()]
-            )
-            content = [
-                "<!DOCTYPE html><html><head><meta charset='utf-8'>",
-                "<title>HTML Files</title></head><body>",
-                "<h1>HTML Files</h1><ul>",
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError, ValueError):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        except OSError:
+            self.send_error(HTTPStatus.FORBIDDEN, "Access denied")
+            return None
+        if stat.S_ISDIR(st.st_mode):
+            return super().send_head()
+        if not stat.S_ISREG(st.st_mode):
+            self.send_error(HTTPStatus.FORBIDDEN, "Not a file")
+            return None
+        if ctype is None:
+            ctype = self.guess_type(path)
+        # Small text-like files also have a cached gzip variant, which gets
+        # its own ETag; Vary tells caches the encoding depends on the request
+        extra_headers = b""
+        gzipped = False
+        if st.st_size <= _BODY_CACHE_MAX_FILE and ctype.startswith(
+            _COMPRESSIBLE_TYPES
+        ):
+            extra_headers = b"Vary: Accept-Encoding\r\n"
+            gzipped = _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        etag = f'W/"{st.st_mtime_ns:x}-{st.st_size:x}{"-gz" if gzipped else ""}"'
+        if self._not_modified(etag, st):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            if extra_headers:
+                self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return None
+        if gzipped:
+            extra_headers += b"Content-Encoding: gzip\r\n"
+        try:
+            if st.st_size <= _BODY_CACHE_MAX_FILE:
+                body = _cached_body(path, st, gzipped)
+                f, length = io.BytesIO(body), len(body)
+            else:
+                f, length = open(path, "rb"), st.st_size
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        # Equivalent to send_response(200) plus send_header() per field,
+        # but filled into a single pre-encoded template. Like end_headers()
+        # this relies on http.server's private _headers_buffer.
+        self.log_request(HTTPStatus.OK)
+        if self.request_version != "HTTP/0.9":
+            self._headers_buffer = [
+                _FILE_200_HEADERS
+                % (
+                    self.protocol_version.encode("latin-1"),
+                    self.version_string().encode("latin-1"),
+                    self.date_time_string().encode("latin-1"),
+                    ctype.encode("latin-1"),
+                    length,
+                    self.date_time_string(st.st_mtime).encode("latin-1"),
+                    etag.encode("latin-1"),
+                    extra_headers,
+                )
             ]
-            for f in html_files:
-                content.append(f"<li><a href='/{f}'>{f}</a></li>")
-            content.append("</ul></body></html>")
-            body = "\n".join(content).encode("utf-8")
+        # do_HEAD never calls copyfile(), so only hold them back for GET
+        self._hold_headers = self.command != "HEAD"
+        self.end_headers()
+        return f
+
+    # Decoded path part of the request target, query and fragment dropped.
+    # Like the stock translate_path(), fall back to replacement characters
+    # when the escapes aren't valid UTF-8 (e.g. "/%ff").
+    def _url_path(self):
+        path = self.path.split("?", 1)[0].split("#", 1)[0]
+        try:
+            return unquote(path, errors="surrogatepass")
+        except UnicodeDecodeError:
+            return unquote(path)
+
+    # Map the request path into the served directory with string operations
+    # only (no resolve()/stat per component); None if it would escape it.
+    # A trailing slash is kept so "file.html/" fails to stat, as in the stock
+    # translate_path().
+    def _file_path(self):
+        path = self._url_path()
+        root = self.directory
+        joined = os.path.normpath(os.path.join(root, path.lstrip("/")))
+        if joined != root and not joined.startswith(os.path.join(root, "")):
+            return None
+        if path.endswith("/"):
+            joined = os.path.join(joined, "")
+        return joined
+
+    def _not_modified(self, etag, st):
+        # If-None-Match wins over If-Modified-Since (RFC 7232 3.3)
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+            return "*" in tags or etag.removeprefix("W/") in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is None:
+            return False
+        try:
+            ims = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        if ims.tzinfo is None:
+            ims = ims.replace(tzinfo=datetime.timezone.utc)
+        return int(st.st_mtime) <= ims.timestamp()
+
+    # Let the kernel push regular files straight to the socket (sendfile)
+    # instead of copying them through Python; in-memory bodies are written
+    # in one go, and anything else is copied in large blocks. The header
+    # block held back by send_head() goes out with the body: in the same
+    # write for in-memory bodies, corked with MSG_MORE ahead of sendfile().
+    def copyfile(self, source, outputfile):
+        held, self._held_headers = self._held_headers, b""
+        if isinstance(source, io.BytesIO):
+            outputfile.write(held + source.getvalue())
+            return
+        if hasattr(os, "sendfile"):
+            try:
+                source.fileno()
+            except (AttributeError, OSError):
+                pass
+            else:
+                outputfile.flush()
+                if held:
+                    self.connection.sendall(held, _MSG_MORE)
+                self.connection.sendfile(source)
+                return
+        outputfile.write(held)
+        shutil.copyfileobj(source, outputfile, _COPY_BUFSIZE)
+
+    # Access and error lines go through logging (and so the queue) rather
+    # than straight to stderr. Control characters are escaped as in the
+    # stock log_message(), so request data can't inject terminal sequences.
+    def log_message(self, format, *args):
+        message = (format % args).translate(self._control_char_table)
+        logger.info("%s - %s", self.address_string(), message)
+
+    # Same as the stock send_error, but with the body from _error_body()
+    def send_error(self, code, message=None, explain=None):
+        try:
+            shortmsg, longmsg = self.responses[code]
+        except KeyError:
+            shortmsg, longmsg = "???", "???"
+        if message is None:
+            message = shortmsg
+        if explain is None:
+            explain = longmsg
+        self.log_error("code %d, message %s", code, message)
+        self.send_response(code, message)
+        self.send_header("Connection", "close")
+
+        # No body for 1xx, 204, 205 and 304 (RFC 7230 3.3, RFC 7231 6.3.6)
+        body = None
+        if code >= 200 and code not in (
+            HTTPStatus.NO_CONTENT,
+            HTTPStatus.RESET_CONTENT,
+            HTTPStatus.NOT_MODIFIED,
+        ):
+            body = _error_body(self.error_message_format, code, message, explain)
+            self.send_header("Content-Type", self.error_content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if self.command != "HEAD" and body:
+            self.wfile.write(body)
+
+    def _serve_index(self):
+        try:
+            body = self._index_entry()[1]
             self.send_response(200)
             self.send_header("Content-Type", "text/html; charset=utf-8")
             self.send_header("Content-Length", str(len(body)))
             self.end_headers()
-            self.wfile.write(body)
+            if self.command != "HEAD":
+                self.wfile.write(body)
         except Exception as e:
-            logger.error(f"Error serving index: {e}")
+            logger.error("Error serving index: %s", e)
             self.send_error(500, "Internal server error")
 
+    def _index_entry(self):
+        mtime = os.stat(self.directory).st_mtime_ns
+        with _INDEX_LOCK:
+            entry = _INDEX_CACHE.get(self.directory)
+            if entry is None or entry[0] != mtime:
+                entry = (mtime, *self._scan_directory())
+                _INDEX_CACHE[self.directory] = entry
+        return entry
+
+    def _scan_directory(self):
+        # list only .html by default; adjust if you want to list others
+        with os.scandir(self.directory) as entries:
+            html_files = sorted(
+                e.name for e in entries if e.name.endswith(".html") and e.is_file()
+            )
+        content = [
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+            "<title>HTML Files</title></head><body>",
+            "<h1>HTML Files</h1><ul>",
+        ]
+        content.extend(
+            f"<li><a href='/{html.escape(quote(f))}'>{html.escape(f)}</a></li>"
+            for f in html_files
+        )
+        content.append("</ul></body></html>")
+        routes = {
+            "/" + quote(f): (os.path.join(self.directory, f), self.guess_type(f))
+            for f in html_files
+        }
+        return "\n".join(content).encode("utf-8"), routes
+
+
+class COIHTTPServer(http.server.HTTPServer):
+    # Browsers open a burst of connections per page; the default backlog is 5
+    request_queue_size = 128
+
+    # How long a connection may sit without sending a request
+    idle_timeout = 15
+
+    # Requests are handled by a fixed pool of daemon threads rather than a
+    # new thread per connection. A connection only goes to a worker once it
+    # has a request to read: new and idle keep-alive connections are parked
+    # in a selector on their own thread, which hands them over when they
+    # become readable. The hand-off queue is bounded, so once every worker
+    # is busy ready connections wait there instead of piling up.
+    def __init__(self, server_address, handler_class, threads):
+        super().__init__(server_address, handler_class)
+        self._requests = queue.Queue(maxsize=threads)
+        self._parked = queue.SimpleQueue()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        threading.Thread(target=self._idle_loop, daemon=True).start()
+        for _ in range(threads):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def get_request(self):
+        request, client_address = super().get_request()
+        request.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        return request, client_address
+
+    def process_request(self, request, client_address):
+        self._park(None, request, client_address)
+
+    def finish_request(self, request, client_address):
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def _worker(self):
+        while True:
+            handler, request, client_address = self._requests.get()
+            try:
+                if handler is None:
+                    handler = self.finish_request(request, client_address)
+                else:
+                    handler.resume()
+            except Exception:
+                self.handle_error(request, client_address)
+                self.shutdown_request(request)
+                continue
+            if handler.idle:
+                self._park(handler, request, client_address)
+            else:
+                self.shutdown_request(request)
+
+    # Hand a connection to the idle loop (handler is None for a connection
+    # that hasn't sent its first request yet)
+    def _park(self, handler, request, client_address):
+        self._parked.put((handler, request, client_address))
+        try:
+            self._wakeup_send.send(b"\0")
+        except BlockingIOError:
+            pass  # the loop has wakeups pending already
+
+    def _idle_loop(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        while True:
+            for key, _ in selector.select(timeout=1):
+                if key.fileobj is self._wakeup_recv:
+                    try:
+                        self._wakeup_recv.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    deadline = time.monotonic() + self.idle_timeout
+                    while True:
+                        try:
+                            item = self._parked.get_nowait()
+                        except queue.Empty:
+                            break
+                        selector.register(
+                            item[1], selectors.EVENT_READ, (item, deadline)
+                        )
+                else:
+                    selector.unregister(key.fileobj)
+                    self._requests.put(key.data[0])
+            now = time.monotonic()
+            for key in list(selector.get_map().values()):
+                if key.data is not None and key.data[1] <= now:
+                    selector.unregister(key.fileobj)
+                    handler, request, _ = key.data[0]
+                    if handler is not None:
+                        handler.idle = False
+                        handler.finish()
+                    self.shutdown_request(request)
+
+
+# SIGTERM/SIGHUP stop the server the same way Ctrl+C does
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+# A forked worker stops serving once its parent is gone (it is reparented)
+def _exit_with_parent(httpd, parent_pid):
+    while os.getppid() == parent_pid:
+        time.sleep(1)
+    httpd.shutdown()
+
 
 def main():
     parser = argparse.ArgumentParser(description="COI static server (SAB-ready)")
     parser.add_argument("-p", "--port", type=int, default=8001)
     parser.add_argument("-d", "--directory", type=str, default=".")
     parser.add_argument("--host", type=str, default="localhost")
+    # Workers are only busy while a request is in flight (idle keep-alive
+    # connections are parked), so this bounds concurrent requests
+    parser.add_argument(
+        "--http-threads",
+        type=int,
+        default=max(16, min(32, (os.cpu_count() or 1) * 4)),
+    )
+    parser.add_argument("--workers", type=int, default=1)
     args = parser.parse_args()
+    if args.http_threads < 1:
+        parser.error("--http-threads must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and not (
+        hasattr(os, "fork") and hasattr(socket, "SO_REUSEPORT")
+    ):
+        parser.error("--workers needs fork() and SO_REUSEPORT")
 
     directory = Path(args.directory).resolve()
     if not directory.is_dir():
-        logger.error(f"Invalid directory: {directory}")
+        logger.error("Invalid directory: %s", directory)
         sys.exit(1)
 
-    # Threaded server so workers/assets load in parallel
-    class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
-        daemon_threads = True
+    COIRequestHandler._resolved_root = str(directory)
 
-    handler = lambda *h_args, **h_kwargs: COIRequestHandler(
-        *h_args, directory=str(directory), **h_kwargs
-    )
-    with ThreadingHTTPServer((args.host, args.port), handler) as httpd:
-        logger.info(f"Serving: {directory}")
-        logger.info(f"URL:     http://{args.host}:{args.port}")
-        logger.info(
-            "COOP/COEP enabled (SharedArrayBuffer should work). Ctrl+C to stop."
-        )
-        try:
-            httpd.serve_forever()
-        except KeyboardInterrupt:
-            logger.info("Server stopped by user")
+    # Extra processes each bind the same port with SO_REUSEPORT and the
+    # kernel spreads connections across them. Fork before any server thread
+    # exists, and with the log listener paused.
+    is_child = False
+    children = []
+    stop_signals = ()
+    if args.workers > 1:
+        COIHTTPServer.allow_reuse_port = True
+        parent_pid = os.getpid()
+        _log_listener.stop()
+        for _ in range(args.workers - 1):
+            pid = os.fork()
+            if pid == 0:
+                is_child = True
+                children = []
+                break
+            children.append(pid)
+        _log_listener.start()
+        stop_signals = (signal.SIGTERM, signal.SIGHUP)
+        for signum in stop_signals:
+            signal.signal(signum, _interrupt)
+
+    try:
+        # Threaded server so workers/assets load in parallel
+        with COIHTTPServer(
+            (args.host, args.port), COIRequestHandler, args.http_threads
+        ) as httpd:
+            if is_child:
+                threading.Thread(
+                    target=_exit_with_parent, args=(httpd, parent_pid), daemon=True
+                ).start()
+            else:
+                logger.info("Serving: %s", directory)
+                logger.info("URL:     http://%s:%d", args.host, args.port)
+                logger.info(
+                    "COOP/COEP enabled (SharedArrayBuffer should work). Ctrl+C to stop."
+                )
+            try:
+                httpd.serve_forever()
+            except KeyboardInterrupt:
+                if not is_child:
+                    logger.info("Server stopped by user")
+    finally:
+        # Already shutting down; a forwarded signal mustn't interrupt that
+        for signum in stop_signals:
+            signal.signal(signum, signal.SIG_IGN)
+        # Ctrl+C reaches the whole process group, but a signal sent to the
+        # parent alone (or a failed start) has to be passed on
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            os.waitpid(pid, 0)
 
 
 if __name__ == "__main__":
-    main()
+    _log_listener.start()
+    try:
+        main()
+    finally:
+        _log_listener.stop()